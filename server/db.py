@@ -1,8 +1,16 @@
 # server/db.py
+import atexit
+import json
+import math
 import os
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import orjson
 
 # ---------- DB path resolution (env > shared.config > sane default) ----------
 _DB_PATH_CACHE: Optional[str] = None
@@ -47,6 +55,9 @@ def _resolve_db_path() -> str:
     return db_path
 
 # ---------- Schema bootstrap ----------
+_SCHEMA_ENSURED = False
+_SCHEMA_LOCK = threading.Lock()
+
 def _read_schema_sql() -> Optional[str]:
     candidates: Iterable[Path] = [
         Path("/workspace/shared/schema.sql"),
@@ -68,6 +79,43 @@ def _table_exists(conn_obj: sqlite3.Connection, table_name: str) -> bool:
     )
     return cur.fetchone() is not None
 
+# List queries ORDER BY a generated sort_key column so the planner always has
+# a plain column index to range-scan, rather than relying on it matching a
+# COALESCE(...) expression index. ALTER TABLE can only add VIRTUAL generated
+# columns; the index materializes the value either way.
+_SORT_KEYS: Dict[str, str] = {
+    "runs": "COALESCE(updated_at, created_at, id)",
+    "prs": "COALESCE(updated_at, created_at)",
+}
+
+_SORT_INDEXES_SQL = """
+DROP INDEX IF EXISTS runs_order;
+DROP INDEX IF EXISTS prs_order;
+CREATE INDEX IF NOT EXISTS runs_sort ON runs (sort_key DESC);
+CREATE INDEX IF NOT EXISTS prs_sort  ON prs  (sort_key DESC);
+"""
+
+def _ensure_sort_keys(conn_obj: sqlite3.Connection) -> None:
+    # Only tables that already exist are altered. The sort_key indexes are
+    # created separately (_SORT_INDEXES_SQL), never from schema.sql, so they
+    # cannot run ahead of the column on a database that predates it.
+    for table, expr in _SORT_KEYS.items():
+        cols = {r[1] for r in conn_obj.execute(f"PRAGMA table_xinfo({table})")}
+        if cols and "sort_key" not in cols:
+            conn_obj.execute(
+                f"ALTER TABLE {table} ADD COLUMN sort_key TEXT GENERATED ALWAYS AS ({expr}) VIRTUAL"
+            )
+
+# Conditional-request cache for GitHub API responses (ETag + JSON body), so
+# If-None-Match revalidation survives restarts.
+_HTTP_CACHE_SQL = """
+CREATE TABLE IF NOT EXISTS http_cache (
+  url TEXT PRIMARY KEY,
+  etag TEXT,
+  body TEXT
+);
+"""
+
 def _ensure_minimal_schema(conn_obj: sqlite3.Connection) -> None:
     # Minimal but compatible with README schema (runs, prs, run_prs)
     conn_obj.executescript(
@@ -122,115 +170,331 @@ def _ensure_minimal_schema(conn_obj: sqlite3.Connection) -> None:
     )
 
 def _ensure_schema(conn_obj: sqlite3.Connection) -> None:
-    # Fast-path if both core tables exist
-    if _table_exists(conn_obj, "runs") and _table_exists(conn_obj, "prs"):
+    global _SCHEMA_ENSURED
+    if _SCHEMA_ENSURED:
         return
 
-    schema = _read_schema_sql()
-    if schema:
-        conn_obj.executescript(schema)
+    with _SCHEMA_LOCK:
+        # Re-check: another thread may have bootstrapped while we waited.
+        if _SCHEMA_ENSURED:
+            return
+
+        # Existing databases predate sort_key; add it in place before
+        # schema.sql runs against them.
+        _ensure_sort_keys(conn_obj)
+
+        # Fast-path if both core tables exist
+        if not (_table_exists(conn_obj, "runs") and _table_exists(conn_obj, "prs")):
+            schema = _read_schema_sql()
+            if schema:
+                conn_obj.executescript(schema)
+            else:
+                _ensure_minimal_schema(conn_obj)
+            conn_obj.commit()
+            # Tables just created from the minimal schema have no sort_key.
+            _ensure_sort_keys(conn_obj)
+
+        # Index the sort keys, then refresh planner stats so they are used.
+        conn_obj.executescript(_SORT_INDEXES_SQL)
+        conn_obj.executescript(_HTTP_CACHE_SQL)
+        conn_obj.execute("PRAGMA optimize;")
+        _build_queries(conn_obj)
+
+        _SCHEMA_ENSURED = True
+
+# ---------- Connection pool ----------
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA busy_timeout=5000;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA foreign_keys=ON;",
+)
+_MMAP_SIZE = 268435456  # 256 MiB
+# Pages of WAL before SQLite auto-checkpoints (the default, set explicitly),
+# and upserted rows between inline PASSIVE checkpoints. The row counter is
+# only touched while holding the writer lock.
+_WAL_AUTOCHECKPOINT = 1000
+_CHECKPOINT_EVERY = 1000
+_ROWS_SINCE_CHECKPOINT = 0
+# Prepared statements kept per connection; the query SQL is constant so
+# repeated calls re-bind a cached plan instead of re-parsing.
+_CACHED_STATEMENTS = 512
+
+def _open_connection(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro&cache=private"
+        connection = sqlite3.connect(
+            uri, uri=True, check_same_thread=False, cached_statements=_CACHED_STATEMENTS
+        )
     else:
-        _ensure_minimal_schema(conn_obj)
-
-    conn_obj.commit()
-
-# ---------- Connection ----------
-def conn() -> sqlite3.Connection:
-    db_path = _resolve_db_path()
-    connection = sqlite3.connect(db_path)
-    connection.row_factory = sqlite3.Row
-
-    # Pragmas for durability + correctness
-    try:
-        connection.execute("PRAGMA journal_mode=WAL;")
-    except Exception:
-        pass
+        # Writer runs in autocommit mode; transactions are opened explicitly.
+        connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None, cached_statements=_CACHED_STATEMENTS
+        )
+
+    # journal_mode is persistent and can only be switched by a writable
+    # connection. It is tried on its own so a locked DB or read-only
+    # filesystem does not also skip the per-connection pragmas below.
+    if not readonly:
+        try:
+            # The returned mode is the one actually in effect; filesystems
+            # without shared memory keep their rollback journal, in which
+            # case the WAL checkpoint setting is meaningless.
+            mode = connection.execute("PRAGMA journal_mode=WAL;").fetchone()
+            if mode and str(mode[0]).lower() == "wal":
+                connection.execute(f"PRAGMA wal_autocheckpoint={_WAL_AUTOCHECKPOINT};")
+        except Exception:
+            pass
+    # Pragmas for durability + throughput, each applied independently.
+    for pragma in _PRAGMAS:
+        try:
+            connection.execute(pragma)
+        except Exception:
+            pass
     try:
-        connection.execute("PRAGMA foreign_keys=ON;")
+        connection.execute(f"PRAGMA mmap_size={_MMAP_SIZE};")
     except Exception:
         pass
-
-    _ensure_schema(connection)
     return connection
 
+class _ConnectionPool:
+    """
+    Long-lived connections for one DB file: a single writer shared behind a
+    lock, plus one read-only connection per thread.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        # The writer is opened first so the file and schema exist before any
+        # read-only connection tries to attach to it.
+        self.writer = _open_connection(db_path)
+        _ensure_schema(self.writer)
+
+    def reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = _open_connection(self.db_path, readonly=True)
+            self._local.connection = connection
+            with self._readers_lock:
+                self._readers.append(connection)
+        return connection
+
+    def close(self) -> None:
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        with self.write_lock:
+            for connection in [*readers, self.writer]:
+                # SQLite recommends PRAGMA optimize before closing so the
+                # planner has fresh stats next time.
+                try:
+                    connection.execute("PRAGMA optimize;")
+                except Exception:
+                    pass
+                if connection is self.writer:
+                    # Readers are already closed, so this can fold the whole
+                    # WAL back into the main file and truncate it.
+                    try:
+                        connection.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                    except Exception:
+                        pass
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+_POOL: Optional[_ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+def _get_pool() -> _ConnectionPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = _ConnectionPool(_resolve_db_path())
+    return _POOL
+
+def _close_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.close()
+
+atexit.register(_close_pool)
+
+def read_conn() -> sqlite3.Connection:
+    """
+    Return this thread's read-only (mode=ro) pooled connection. It stays
+    owned by the pool: use it directly, not as a context manager, so reads
+    never issue a COMMIT. Readers never take the writer lock.
+    """
+    return _get_pool().reader()
+
+@contextmanager
+def write_conn() -> Iterator[sqlite3.Connection]:
+    """
+    Yield the single pooled writer (autocommit; callers issue BEGIN/COMMIT).
+    Access is serialized; a transaction left open is committed, or rolled
+    back on error.
+    """
+    pool = _get_pool()
+    with pool.write_lock:
+        connection = pool.writer
+        try:
+            yield connection
+        except BaseException:
+            if connection.in_transaction:
+                connection.rollback()
+            raise
+        # Writers that manage BEGIN/COMMIT themselves leave nothing pending;
+        # only close out a transaction a caller left open.
+        if connection.in_transaction:
+            connection.commit()
+
+def conn(readonly: bool = False) -> ContextManager[sqlite3.Connection]:
+    """Pooled connection context: read_conn() if readonly, else write_conn()."""
+    return nullcontext(read_conn()) if readonly else write_conn()
+
+def optimize() -> None:
+    """
+    Refresh query-planner statistics. Long-lived servers can call this after
+    large upsert batches; it also runs automatically at interpreter exit.
+    """
+    with write_conn() as c:
+        c.execute("PRAGMA optimize;")
+
+def checkpoint() -> None:
+    """
+    Fold the WAL back into the main database file and truncate it. This
+    waits for readers, so it only runs here and at shutdown; upserts do a
+    non-blocking PASSIVE checkpoint every _CHECKPOINT_EVERY rows instead.
+    """
+    global _ROWS_SINCE_CHECKPOINT
+    with write_conn() as c:
+        c.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        _ROWS_SINCE_CHECKPOINT = 0
+
 # ---------- Helpers ----------
-def _rows_to_dicts(rows: Iterable[sqlite3.Row]) -> List[Dict[str, Any]]:
-    return [dict(r) for r in rows]
+def _columns(cur: sqlite3.Cursor) -> List[str]:
+    return [d[0] for d in cur.description]
 
-# ---------- Queries ----------
-def get_runs(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+def _rows_to_dicts(cur: sqlite3.Cursor) -> List[Dict[str, Any]]:
     """
-    Return recent runs (most-recent first). If limit is None, return all.
+    Fetch all rows from an executed cursor as dicts. Rows come back as plain
+    tuples (no row_factory) and are zipped against the column names once.
+    """
+    columns = _columns(cur)
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+# ---------- Queries ----------
+_FETCH_BATCH = 256
+
+# Query SQL is fixed for the life of the process so every call passes
+# identical text and hits the per-connection statement cache. The runs/prs
+# selects are built once the schema is ensured: their column lists come from
+# PRAGMA table_info, which omits the generated sort_key column and follows
+# whatever columns this database actually has.
+_QUERIES: Dict[str, str] = {}
+
+def _build_queries(conn_obj: sqlite3.Connection) -> None:
+    runs_cols = ", ".join(r[1] for r in conn_obj.execute("PRAGMA table_info(runs)"))
+    prs_cols = ", ".join(r[1] for r in conn_obj.execute("PRAGMA table_info(prs)"))
+    _QUERIES["runs"] = f"""
+        SELECT {runs_cols}
+        FROM runs
+        ORDER BY sort_key DESC
+        LIMIT ?
     """
-    q = """
-        SELECT *
+    _QUERIES["run_by_id"] = f"""
+        SELECT {runs_cols}
         FROM runs
-        ORDER BY COALESCE(updated_at, created_at, id) DESC
+        WHERE id = ?
+    """
+    _QUERIES["recent_prs"] = f"""
+        SELECT {prs_cols}
+        FROM prs
+        ORDER BY sort_key DESC
+        LIMIT ?
     """
-    args: Tuple[Any, ...] = ()
-    if limit is not None:
-        q += " LIMIT ?"
-        args = (int(limit),)
 
-    with conn() as c:
-        cur = c.execute(q, args)
-        return _rows_to_dicts(cur.fetchall())
+_RUN_PRS_SQL = """
+    SELECT pr_url AS html_url,
+           MAX(COALESCE(updated_at, created_at)) AS updated_at,
+           COUNT(*) AS occurrences,
+           MAX(title) AS title
+    FROM runs
+    WHERE pr_url IS NOT NULL AND TRIM(pr_url) <> ''
+    GROUP BY pr_url
+    ORDER BY updated_at DESC
+    LIMIT ?
+"""
+
+def iter_runs(limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield recent runs (most-recent first) without materializing the whole
+    result; rows are pulled from SQLite _FETCH_BATCH at a time.
+    """
+    # A negative LIMIT means "no limit" in SQLite, so one statement covers both.
+    cur = read_conn().execute(_QUERIES["runs"], (int(limit) if limit is not None else -1,))
+    cur.arraysize = _FETCH_BATCH
+    columns = _columns(cur)
+    while True:
+        batch = cur.fetchmany()
+        if not batch:
+            break
+        for row in batch:
+            yield dict(zip(columns, row))
+
+def get_runs(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Return recent runs (most-recent first). If limit is None, return all.
+    """
+    return list(iter_runs(limit))
 
 def get_run_by_id(run_id: str) -> Optional[Dict[str, Any]]:
-    with conn() as c:
-        row = c.execute(
-            """
-            SELECT *
-            FROM runs
-            WHERE id = ?
-            """,
-            (run_id,),
-        ).fetchone()
-        return dict(row) if row else None
+    cur = read_conn().execute(_QUERIES["run_by_id"], (run_id,))
+    row = cur.fetchone()
+    return dict(zip(_columns(cur), row)) if row else None
 
 def get_recent_prs(limit: Optional[int] = 50) -> List[Dict[str, Any]]:
     """
     Prefer the canonical prs table. If it's empty, synthesize from runs.pr_url.
     """
-    with conn() as c:
-        # First try real PRs table
-        prs = c.execute(
-            """
-            SELECT *
-            FROM prs
-            ORDER BY COALESCE(updated_at, created_at) DESC
-            LIMIT ?
-            """,
-            (int(limit) if limit is not None else 50,),
-        ).fetchall()
-        if prs:
-            return _rows_to_dicts(prs)
-
-        # Fallback: derive distinct PR URLs from runs
-        synth = c.execute(
-            """
-            SELECT pr_url AS html_url,
-                   MAX(COALESCE(updated_at, created_at)) AS updated_at,
-                   COUNT(*) AS occurrences,
-                   MAX(title) AS title
-            FROM runs
-            WHERE pr_url IS NOT NULL AND TRIM(pr_url) <> ''
-            GROUP BY pr_url
-            ORDER BY updated_at DESC
-            LIMIT ?
-            """,
-            (int(limit) if limit is not None else 50,),
-        ).fetchall()
-        # Normalize shape a bit
-        out: List[Dict[str, Any]] = []
-        for r in synth:
-            d = dict(r)
-            d["id"] = d.get("html_url", "")
-            d["state"] = "open"  # unknown; placeholder
-            out.append(d)
-        return out
+    args = (int(limit) if limit is not None else 50,)
+    c = read_conn()
+    # First try real PRs table. A non-empty result doubles as the
+    # emptiness probe, so the common case is a single statement.
+    prs = _rows_to_dicts(c.execute(_QUERIES["recent_prs"], args))
+    if prs:
+        return prs
+
+    # Fallback: derive distinct PR URLs from runs
+    synth = _rows_to_dicts(c.execute(_RUN_PRS_SQL, args))
+    # Normalize shape a bit
+    for d in synth:
+        d["id"] = d.get("html_url", "")
+        d["state"] = "open"  # unknown; placeholder
+    return synth
+
+_GET_HTTP_CACHE_SQL = "SELECT etag, body FROM http_cache WHERE url = ?"
+
+def get_http_cache(url: str) -> Optional[Tuple[str, str]]:
+    """Return the stored (etag, body) for a GitHub API URL, if any."""
+    row = read_conn().execute(_GET_HTTP_CACHE_SQL, (url,)).fetchone()
+    return (row[0], row[1]) if row else None
 
 # ---------- Upserts ----------
+# Matches https://github.com/{owner}/{repo}/pull/{n} as well as the
+# git@github.com:{owner}/{repo}/pull/{n} form. The number must end the
+# path segment, so /pull/12abc is rejected rather than read as #12.
+_PR_URL_RE = re.compile(r"github\.com[/:]([^/]+)/([^/]+)/pull/(\d+)(?:[/?#]|$)")
+
 def _normalize_pr_identity(pr_row: Mapping[str, Any]) -> Tuple[str, Optional[str], Optional[str], Optional[int]]:
     """
     Return (id, owner, repo, number).
@@ -244,15 +508,9 @@ def _normalize_pr_identity(pr_row: Mapping[str, Any]) -> Tuple[str, Optional[str
     # Attempt to parse from URL if necessary
     if (owner is None or repo is None or number is None) and not pr_id:
         url = pr_row.get("html_url") or pr_row.get("url")
-        if isinstance(url, str) and "github.com" in url and "/pull/" in url:
-            try:
-                parts = url.split("github.com/")[1].split("/pull/")
-                org_repo = parts[0]
-                num = int(parts[1].split("/")[0])
-                owner, repo = org_repo.split("/", 1)
-                number = num
-            except Exception:
-                pass
+        m = _PR_URL_RE.search(url) if isinstance(url, str) else None
+        if m:
+            owner, repo, number = m.group(1), m.group(2), int(m.group(3))
 
     if not pr_id and owner and repo and number is not None:
         pr_id = f"{owner}/{repo}#{int(number)}"
@@ -268,14 +526,56 @@ def _normalize_pr_identity(pr_row: Mapping[str, Any]) -> Tuple[str, Optional[str
 
     return str(pr_id), owner, repo, int(number) if number is not None else None
 
-def upsert_pr(pr_row: Mapping[str, Any]) -> None:
+_PR_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "owner",
+    "repo",
+    "number",
+    "title",
+    "author",
+    "state",
+    "html_url",
+    "created_at",
+    "updated_at",
+    "merged_at",
+    "additions",
+    "deletions",
+    "changed_files",
+    "draft",
+    "review_count",
+    "ci_status",
+    "has_tests",
+    "doc_touch_ratio",
+    "diff_stats",
+)
+
+_PR_UPSERT_SQL = (
+    f"INSERT INTO prs ({','.join(_PR_COLUMNS)}) "
+    f"VALUES ({','.join(f':{k}' for k in _PR_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET {','.join(f'{k}=excluded.{k}' for k in _PR_COLUMNS if k != 'id')}"
+)
+
+def _has_non_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+def _json_dumps(value: Any) -> str:
+    # orjson would turn NaN/Infinity into null; keep the stdlib encoding for those.
+    if _has_non_finite(value):
+        return json.dumps(value)
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+def _normalize_pr_row(pr_row: Mapping[str, Any]) -> Dict[str, Any]:
     """
-    Upsert into prs with normalized keys. Accepts flexible inputs:
+    Map a flexible PR input onto the prs columns. Accepts:
       - keys from GitHub API (title, user.login, html_url, state, merged_at, additions, deletions, changed_files, draft, review_comments)
       - or simplified keys (url, author, repo, number, etc.)
     """
-    import json
-
     pr_id, owner, repo, number = _normalize_pr_identity(pr_row)
 
     # Normalize fields
@@ -295,13 +595,15 @@ def upsert_pr(pr_row: Mapping[str, Any]) -> None:
     has_tests = 1 if pr_row.get("has_tests") else 0
     doc_touch_ratio = float(pr_row.get("doc_touch_ratio") or 0.0)
     diff_stats = pr_row.get("diff_stats")
-    if diff_stats is not None and not isinstance(diff_stats, str):
+    if isinstance(diff_stats, bytes):
+        diff_stats = diff_stats.decode("utf-8", errors="replace")
+    elif diff_stats is not None and not isinstance(diff_stats, str):
         try:
-            diff_stats = json.dumps(diff_stats)
+            diff_stats = _json_dumps(diff_stats)
         except Exception:
             diff_stats = "{}"
 
-    row = {
+    return {
         "id": pr_id,
         "owner": owner,
         "repo": repo,
@@ -324,10 +626,61 @@ def upsert_pr(pr_row: Mapping[str, Any]) -> None:
         "diff_stats": diff_stats,
     }
 
-    with conn() as c:
-        keys = ",".join(row.keys())
-        qmarks = ",".join([f":{k}" for k in row.keys()])
-        update = ",".join([f"{k}=excluded.{k}" for k in row.keys() if k != "id"])
-        sql = f"INSERT INTO prs ({keys}) VALUES ({qmarks}) ON CONFLICT(id) DO UPDATE SET {update}"
-        c.execute(sql, row)
-        c.commit()
+def upsert_prs(pr_rows: Iterable[Mapping[str, Any]]) -> None:
+    """
+    Upsert many PRs in a single transaction. Rows are normalized as in
+    upsert_pr before anything is written, so a bad row aborts the batch.
+    """
+    global _ROWS_SINCE_CHECKPOINT
+    rows = [_normalize_pr_row(r) for r in pr_rows]
+    if not rows:
+        return
+
+    with write_conn() as c:
+        # Take the write lock up front so WAL writers never race a
+        # deferred read lock into SQLITE_BUSY on upgrade.
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            # No RETURNING clause and the cursor is never read, so SQLite
+            # doesn't materialize a result set for the batch.
+            c.executemany(_PR_UPSERT_SQL, rows)
+            c.execute("COMMIT")
+        except Exception:
+            # SQLite may already have rolled back (SQLITE_FULL, IOERR, ...);
+            # a bare ROLLBACK would then mask the original error.
+            if c.in_transaction:
+                c.execute("ROLLBACK")
+            raise
+
+        _ROWS_SINCE_CHECKPOINT += len(rows)
+        if _ROWS_SINCE_CHECKPOINT >= _CHECKPOINT_EVERY:
+            # PASSIVE copies what it can without waiting on readers or the
+            # busy handler, so the upsert never stalls behind a long read.
+            c.execute("PRAGMA wal_checkpoint(PASSIVE);")
+            _ROWS_SINCE_CHECKPOINT = 0
+
+def upsert_pr(pr_row: Mapping[str, Any]) -> None:
+    """
+    Upsert into prs with normalized keys. See _normalize_pr_row for the
+    accepted input shapes.
+    """
+    upsert_prs([pr_row])
+
+_LINK_RUN_PR_SQL = "INSERT OR IGNORE INTO run_prs (run_id, pr_id) VALUES (?, ?)"
+
+def link_run_pr(run_id: str, pr_id: str) -> None:
+    """
+    Record that a run produced/referenced a PR (run_prs). Idempotent.
+    """
+    with write_conn() as c:
+        c.execute(_LINK_RUN_PR_SQL, (run_id, pr_id))
+
+_PUT_HTTP_CACHE_SQL = (
+    "INSERT INTO http_cache (url, etag, body) VALUES (?, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET etag=excluded.etag, body=excluded.body"
+)
+
+def put_http_cache(url: str, etag: str, body: str) -> None:
+    """Store the latest ETag and JSON body seen for a GitHub API URL."""
+    with write_conn() as c:
+        c.execute(_PUT_HTTP_CACHE_SQL, (url, etag, body))
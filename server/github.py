@@ -1,12 +1,17 @@
 import os
 import re
-import json
+import asyncio
+import functools
+import math
+import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlparse
 from datetime import date, datetime
 from decimal import Decimal
 
 import httpx
+import orjson
 
 __all__ = [
     "parse_pr_identifier",
@@ -18,6 +23,26 @@ __all__ = [
 
 _GITHUB_API_VERSION = "2022-11-28"
 
+_SHORT_ID_RE = re.compile(r"^(?P<owner>[^\s/]+)/(?P<repo>[^\s#]+)#(?P<number>\d+)$")
+# Plain https://github.com/{owner}/{repo}/pull/{number} links, the common
+# case, matched without building a urlparse ParseResult.
+_WEB_PR_URL_RE = re.compile(
+    r"^(?i:https?://(?:www\.)?github\.com)/([^/?#\s]+)/([^/?#\s]+)/pull/(\d+)(?:[/?#]|$)"
+)
+
+# In-process LRU cache of normalized PRs keyed by (owner, repo, number), with
+# a TTL per entry. Merged PRs are effectively immutable, so they are kept much
+# longer than open ones. Sizes and TTLs come from PR_CACHE_TTL_OPEN,
+# PR_CACHE_TTL_MERGED and PR_CACHE_MAX (see _pr_cache_ttl/_pr_cache_max).
+_PR_CACHE: "OrderedDict[Tuple[str, str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# Locks for fetches in flight only; each is dropped once its fetch completes.
+_PR_LOCKS: Dict[Tuple[str, str, int], asyncio.Lock] = {}
+
+# ETag and parsed body of the last 200 response per GitHub API URL: a small
+# LRU in front of the http_cache table, which holds the full set.
+_ETAG_STORE_MAX = 256
+_ETAG_STORE: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+
 
 def parse_pr_identifier(identifier: str) -> Tuple[str, str, int]:
     """Parse a GitHub PR identifier from various formats.
@@ -29,17 +54,26 @@ def parse_pr_identifier(identifier: str) -> Tuple[str, str, int]:
 
     Returns a tuple of (owner, repo, pr_number).
     Raises ValueError if parsing fails.
+
+    Results are memoized; the same PR URL typically recurs across many runs.
     """
-    identifier = identifier.strip()
+    return _parse_pr_identifier_cached(identifier.strip())
+
 
+@functools.lru_cache(maxsize=4096)
+def _parse_pr_identifier_cached(identifier: str) -> Tuple[str, str, int]:
     # Short form: owner/repo#123
-    short_match = re.match(r"^(?P<owner>[^\s/]+)/(?P<repo>[^\s#]+)#(?P<number>\d+)$", identifier)
+    short_match = _SHORT_ID_RE.match(identifier)
     if short_match:
         owner = short_match.group("owner")
         repo = short_match.group("repo")
         number = int(short_match.group("number"))
         return owner, repo, number
 
+    web_match = _WEB_PR_URL_RE.match(identifier)
+    if web_match:
+        return web_match.group(1), web_match.group(2), int(web_match.group(3))
+
     # URL forms
     parsed = urlparse(identifier)
     if parsed.scheme and parsed.netloc:
@@ -77,6 +111,55 @@ def parse_pr_url(url: str) -> Tuple[str, str, int]:
     return parse_pr_identifier(url)
 
 
+async def _fetch_json(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> Any:
+    """GET a GitHub API URL, revalidating with If-None-Match when possible.
+
+    A 304 is answered from the stored body; 200 responses carrying an ETag
+    are remembered in memory and persisted via server.db. The SQLite calls
+    run in a worker thread so they never block the event loop.
+    """
+    cached = _ETAG_STORE.get(url)
+    if cached is not None:
+        _ETAG_STORE.move_to_end(url)
+    else:
+        stored = await asyncio.to_thread(_db_http_cache, "get_http_cache", url)
+        if stored:
+            cached = (stored[0], orjson.loads(stored[1]))
+            _remember_etag(url, cached)
+
+    request_headers = headers
+    if cached is not None:
+        request_headers = {**headers, "If-None-Match": cached[0]}
+
+    response = await client.get(url, headers=request_headers)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    response.raise_for_status()
+    data = response.json()
+
+    etag = response.headers.get("ETag")
+    if etag:
+        _remember_etag(url, (etag, data))
+        await asyncio.to_thread(_db_http_cache, "put_http_cache", url, etag, safe_json_dumps(data))
+    return data
+
+
+def _remember_etag(url: str, entry: Tuple[str, Any]) -> None:
+    _ETAG_STORE[url] = entry
+    _ETAG_STORE.move_to_end(url)
+    while len(_ETAG_STORE) > _ETAG_STORE_MAX:
+        _ETAG_STORE.popitem(last=False)
+
+
+def _db_http_cache(name: str, *args: Any) -> Any:
+    # Persistence is best-effort: a missing or locked DB only costs a refetch.
+    try:
+        from server import db as _db  # type: ignore
+        return getattr(_db, name)(*args)
+    except Exception:
+        return None
+
+
 def _json_default_fallback(value: Any) -> Any:
     if isinstance(value, (datetime, date)):
         return value.isoformat()
@@ -93,25 +176,36 @@ def _json_default_fallback(value: Any) -> Any:
     return str(value)
 
 
+def _check_finite(obj: Any) -> None:
+    # orjson writes NaN/Infinity as null; keep the stdlib allow_nan=False contract.
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _check_finite(value)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for value in obj:
+            _check_finite(value)
+
+
 def safe_json_dumps(obj: Any) -> str:
     """Dump an object to JSON safely.
 
     - Uses UTF-8 without escaping non-ASCII
-    - Disallows NaN/Infinity
     - Coerces common non-serializable types
+    - Disallows NaN/Infinity
     """
-    return json.dumps(
-        obj,
-        ensure_ascii=False,
-        allow_nan=False,
-        default=_json_default_fallback,
-        separators=(",", ":"),
-    )
+    _check_finite(obj)
+    return orjson.dumps(obj, default=_json_default_fallback, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
 
 
 async def enrich_pr(pr_identifier: str, github_token: Optional[str] = None, *, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
     """Fetch a PR from GitHub and upsert it into the database.
 
+    Results are cached in-process (PR_CACHE_TTL_OPEN / PR_CACHE_TTL_MERGED
+    seconds), and concurrent calls for the same PR share a single fetch.
+
     Args:
         pr_identifier: PR URL or short id (e.g., "owner/repo#123").
         github_token: GitHub token; if None, will read from env GITHUB_TOKEN.
@@ -137,6 +231,67 @@ async def enrich_pr(pr_identifier: str, github_token: Optional[str] = None, *, c
         "User-Agent": "github-enrichment-module/1.0",
     }
 
+    key = (owner.lower(), repo.lower(), number)
+    cached = _cached_pr(key)
+    if cached is not None:
+        return cached
+
+    lock = _PR_LOCKS.get(key)
+    if lock is None:
+        lock = _PR_LOCKS[key] = asyncio.Lock()
+    try:
+        async with lock:
+            # Another task may have fetched this PR while we waited on the lock.
+            cached = _cached_pr(key)
+            if cached is not None:
+                return cached
+
+            normalized = await _fetch_and_store(owner, repo, number, headers, client)
+            ttl = _pr_cache_ttl(bool(normalized.get("merged_at")))
+            _PR_CACHE[key] = (time.monotonic() + ttl, normalized)
+            _PR_CACHE.move_to_end(key)
+            max_entries = _pr_cache_max()
+            while len(_PR_CACHE) > max_entries:
+                _PR_CACHE.popitem(last=False)
+            return dict(normalized)
+    finally:
+        # Waiters still hold a reference and will find the cached result;
+        # later callers start from the cache, so the lock is no longer needed.
+        if _PR_LOCKS.get(key) is lock:
+            del _PR_LOCKS[key]
+
+
+def _pr_cache_ttl(merged: bool) -> float:
+    # Read on use rather than at import: main.py loads .env after the server
+    # package (and so this module) has been imported.
+    if merged:
+        return float(os.getenv("PR_CACHE_TTL_MERGED", str(30 * 24 * 3600)))
+    return float(os.getenv("PR_CACHE_TTL_OPEN", "120"))
+
+
+def _pr_cache_max() -> int:
+    return int(os.getenv("PR_CACHE_MAX", "1024"))
+
+
+def _cached_pr(key: Tuple[str, str, int]) -> Optional[Dict[str, Any]]:
+    entry = _PR_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, normalized = entry
+    if time.monotonic() >= expires_at:
+        _PR_CACHE.pop(key, None)
+        return None
+    _PR_CACHE.move_to_end(key)
+    return dict(normalized)
+
+
+async def _fetch_and_store(
+    owner: str,
+    repo: str,
+    number: int,
+    headers: Dict[str, str],
+    client: Optional[httpx.AsyncClient],
+) -> Dict[str, Any]:
     close_client = False
     if client is None:
         client = httpx.AsyncClient(timeout=30.0)
@@ -145,9 +300,7 @@ async def enrich_pr(pr_identifier: str, github_token: Optional[str] = None, *, c
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{number}"
 
     try:
-        response = await client.get(url, headers=headers)
-        response.raise_for_status()
-        pr = response.json()
+        pr = await _fetch_json(client, url, headers)
 
         # Normalize the PR record for storage
         normalized: Dict[str, Any] = {
@@ -171,6 +324,7 @@ async def enrich_pr(pr_identifier: str, github_token: Optional[str] = None, *, c
             "created_at": pr.get("created_at"),
             "updated_at": pr.get("updated_at"),
             "closed_at": pr.get("closed_at"),
+            "merged_at": pr.get("merged_at"),
             "raw": pr,
         }
 
@@ -182,17 +336,15 @@ async def enrich_pr(pr_identifier: str, github_token: Optional[str] = None, *, c
                 "Could not import upsert_pr from server.db. Ensure the DB utility is available as server.db.upsert_pr."
             ) from import_exc
 
-        result_or_coro = _upsert_pr(normalized)  # type: ignore
-        # If the DB utility is async, await the returned awaitable. Otherwise, proceed.
-        try:
-            import inspect  # local import to avoid top-level dependency if not needed
-            if inspect.isawaitable(result_or_coro):
-                await result_or_coro  # type: ignore
-        except Exception:
-            # If inspect or awaiting fails for unexpected reasons, re-raise to surface DB contract issues
-            raise
+        # The sync DB utility opens a writer transaction, so call it in a worker
+        # thread to keep the event loop free. If the DB utility is async, the
+        # call only builds the awaitable, which is then awaited here.
+        result_or_coro = await asyncio.to_thread(_upsert_pr, normalized)  # type: ignore
+        import inspect  # local import to avoid top-level dependency if not needed
+        if inspect.isawaitable(result_or_coro):
+            await result_or_coro  # type: ignore
 
         return normalized
     finally:
         if close_client:
-            await client.aclose()
\ No newline at end of file
+            await client.aclose()
@@ -1,12 +1,18 @@
+import asyncio
 import os
-from typing import Any, Dict, Optional
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from .db import get_runs, get_run_by_id, get_recent_prs, _resolve_db_path
+from .db import get_runs, iter_runs, get_run_by_id, get_recent_prs, _resolve_db_path
 
 # Load environment variables
 load_dotenv()
@@ -14,8 +20,42 @@ load_dotenv()
 APP_NAME = os.getenv("APP_NAME", "Cursor Agents MCP")
 APP_DESC = os.getenv("APP_DESC", "Expose scraped Cursor Agent runs and PRs as MCP tools")
 DB_PATH = _resolve_db_path()
+# Upper bound on any tool's `limit`, so one request cannot pull the whole DB.
+MAX_LIMIT = 500
+# Runs pulled from SQLite and serialized per batch when encoding list_tasks.
+ENCODE_BATCH = 256
 
-app = FastAPI(title=APP_NAME, description=APP_DESC, version="0.1.0")
+class ORJSONRequest(Request):
+    async def json(self) -> Any:
+        # orjson parses the raw body bytes directly; its decode error
+        # subclasses json.JSONDecodeError, so FastAPI still answers 422.
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+app = FastAPI(
+    title=APP_NAME,
+    description=APP_DESC,
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
+# Must be set before any route is declared.
+app.router.route_class = ORJSONRoute
+
+def _clamp_limit(limit: Optional[int], default: int) -> int:
+    # Missing/0 means the default; anything else is pinned to 1..MAX_LIMIT
+    # (a negative LIMIT would otherwise mean "all rows" to SQLite).
+    limit = limit or default
+    return 1 if limit < 1 else MAX_LIMIT if limit > MAX_LIMIT else limit
 
 class ListTasksBody(BaseModel):
     limit: Optional[int] = 25
@@ -26,47 +66,134 @@ class TaskBody(BaseModel):
 class ReviewPRsBody(BaseModel):
     limit: Optional[int] = 20
 
-@app.get("/mcp", response_class=JSONResponse)
-async def mcp_manifest() -> Dict[str, Any]:
-    return {
-        "name": APP_NAME,
-        "description": APP_DESC,
-        "environment": {"db_path": DB_PATH},
-        "tools": [
-            {
-                "name": "list_tasks",
-                "description": "List recent Cursor Agent runs scraped from cursor.com/agents",
-                "path": "/tools/list_tasks",
-                "input_schema": {"type": "object", "properties": {"limit": {"type": "integer"}}},
-            },
-            {
-                "name": "task",
-                "description": "Fetch one run by ID (or most recent if not specified)",
-                "path": "/tools/task",
-                "input_schema": {"type": "object", "properties": {"id": {"type": "string"}}},
-            },
-            {
-                "name": "review_prs",
-                "description": "List recent PRs referenced by runs",
-                "path": "/tools/review_prs",
-                "input_schema": {"type": "object", "properties": {"limit": {"type": "integer"}}},
-            },
-        ],
-    }
+# The manifest only depends on import-time settings, so it is serialized
+# once and served as raw bytes.
+_MCP_MANIFEST = orjson.dumps({
+    "name": APP_NAME,
+    "description": APP_DESC,
+    "environment": {"db_path": DB_PATH},
+    "tools": [
+        {
+            "name": "list_tasks",
+            "description": "List recent Cursor Agent runs scraped from cursor.com/agents",
+            "path": "/tools/list_tasks",
+            "input_schema": {"type": "object", "properties": {"limit": {"type": "integer"}}},
+        },
+        {
+            "name": "task",
+            "description": "Fetch one run by ID (or most recent if not specified)",
+            "path": "/tools/task",
+            "input_schema": {"type": "object", "properties": {"id": {"type": "string"}}},
+        },
+        {
+            "name": "review_prs",
+            "description": "List recent PRs referenced by runs",
+            "path": "/tools/review_prs",
+            "input_schema": {"type": "object", "properties": {"limit": {"type": "integer"}}},
+        },
+    ],
+})
+
+@app.get("/mcp")
+async def mcp_manifest() -> Response:
+    return Response(content=_MCP_MANIFEST, media_type="application/json")
+
+def _encode_runs(limit: int) -> bytes:
+    """
+    Encode {"content": [...runs]} ENCODE_BATCH rows at a time, so the run
+    dicts are never all materialized at once. Runs start to finish in the
+    calling thread: the cursor stays on that thread's read connection, and
+    an error surfaces before any byte is sent.
+    """
+    rows = iter_runs(limit=limit)
+    parts = [b'{"content":[']
+    sep = b""
+    while batch := list(islice(rows, ENCODE_BATCH)):
+        parts.append(sep + b",".join(map(orjson.dumps, batch)))
+        sep = b","
+    parts.append(b"]}")
+    return b"".join(parts)
+
+def _db_version() -> Tuple[int, ...]:
+    """
+    Cheap change marker for the DB: (mtime_ns, size) of the main file and
+    its WAL. Any committed write, or checkpoint, changes one of them.
+    """
+    version: List[int] = []
+    for path in (DB_PATH, DB_PATH + "-wal"):
+        try:
+            st = os.stat(path)
+            version += (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version += (0, 0)
+    return tuple(version)
+
+# Last serialized list_tasks body per limit, tagged with the DB version it
+# was built from. Entries from an older version can never hit again, so they
+# are dropped as soon as a body for a newer version is stored; the limits
+# kept are also capped, least recently used first out.
+_LIST_CACHE_MAX = 16
+_LIST_CACHE: "OrderedDict[int, Tuple[Tuple[int, ...], bytes]]" = OrderedDict()
+_LIST_CACHE_LOCK = threading.Lock()
+
+def _cached_list_body(limit: int, version: Tuple[int, ...]) -> Optional[bytes]:
+    with _LIST_CACHE_LOCK:
+        entry = _LIST_CACHE.get(limit)
+        if entry is None or entry[0] != version:
+            return None
+        _LIST_CACHE.move_to_end(limit)
+        return entry[1]
+
+def _list_tasks_body(limit: int, version: Tuple[int, ...]) -> bytes:
+    body = _encode_runs(limit)
+    with _LIST_CACHE_LOCK:
+        for key in [k for k, (v, _) in _LIST_CACHE.items() if v != version]:
+            del _LIST_CACHE[key]
+        _LIST_CACHE[limit] = (version, body)
+        _LIST_CACHE.move_to_end(limit)
+        while len(_LIST_CACHE) > _LIST_CACHE_MAX:
+            _LIST_CACHE.popitem(last=False)
+    return body
 
 @app.post("/tools/list_tasks")
-async def list_tasks(body: ListTasksBody) -> Dict[str, Any]:
-    limit = int(body.limit or 25)
-    return {"content": get_runs(limit=limit)}
+async def list_tasks(body: ListTasksBody) -> Response:
+    limit = _clamp_limit(body.limit, 25)
+    # Pollers repeat the same window; unchanged DB + limit is a cache hit.
+    version = _db_version()
+    content = _cached_list_body(limit, version)
+    if content is None:
+        # One worker call builds the whole (limit-capped) body, keeping the
+        # SQLite reads off the event loop.
+        content = await asyncio.to_thread(_list_tasks_body, limit, version)
+    return Response(content=content, media_type="application/json")
 
 @app.post("/tools/task")
 async def task(body: TaskBody) -> Dict[str, Any]:
     if body.id:
-        return {"content": get_run_by_id(body.id)}
-    runs = get_runs(limit=1)
+        return {"content": await asyncio.to_thread(get_run_by_id, body.id)}
+    runs = await asyncio.to_thread(get_runs, limit=1)
     return {"content": runs[0] if runs else None}
 
 @app.post("/tools/review_prs")
 async def review_prs(body: ReviewPRsBody) -> Dict[str, Any]:
-    limit = int(body.limit or 20)
-    return {"content": get_recent_prs(limit=limit)}
\ No newline at end of file
+    limit = _clamp_limit(body.limit, 20)
+    return {"content": await asyncio.to_thread(get_recent_prs, limit=limit)}
+
+if __name__ == "__main__":
+    import importlib.util
+
+    import uvicorn
+
+    # uvloop and httptools are the fast paths; fall back to the pure-Python
+    # loop/parser where they are unavailable (e.g. uvloop on Windows).
+    uvicorn.run(
+        "server.main:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "7399")),
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        # Hold idle keep-alive sockets longer than uvicorn's 5s default so
+        # polling clients reuse one connection between calls.
+        timeout_keep_alive=int(os.getenv("KEEPALIVE_TIMEOUT", "30")),
+    )
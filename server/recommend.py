@@ -5,7 +5,9 @@ from typing import Any, Dict, List, Protocol, Sequence
 try:
     # Prefer the real Scores class from scoring heuristics if present
     from .scoring import Scores  # type: ignore
+    _CONCRETE_SCORES = True
 except Exception:
+    _CONCRETE_SCORES = False
     # Fallback protocol so this module works even if scoring.py is not present
     class Scores(Protocol):  # type: ignore
         code_quality: float
@@ -27,6 +29,13 @@ NEXT_STEPS_TEMPLATES: Dict[str, str] = {
     'perf_risk': "Benchmark hotspots; add micro-bench or profiling notes.",
 }
 
+# Bound once at import so the hot path skips the dict lookups.
+_TESTS_MISSING = NEXT_STEPS_TEMPLATES['tests_missing']
+_DOCS_LOW = NEXT_STEPS_TEMPLATES['docs_low']
+_TOO_LARGE = NEXT_STEPS_TEMPLATES['too_large']
+_NEEDS_REVIEW = NEXT_STEPS_TEMPLATES['needs_review']
+_PERF_RISK = NEXT_STEPS_TEMPLATES['perf_risk']
+
 
 def recommendations(scores: Scores, pr: Dict[str, Any]) -> List[str]:
     """Return up to 3 actionable next-step recommendations for a PR.
@@ -42,16 +51,30 @@ def recommendations(scores: Scores, pr: Dict[str, Any]) -> List[str]:
 
     has_tests = bool(pr.get('has_tests'))
 
-    if getattr(scores, 'stability', 0.0) < 6.0 or not has_tests:
-        recs.append(NEXT_STEPS_TEMPLATES['tests_missing'])
-    if getattr(scores, 'verbosity', 0.0) < 5.0:
-        recs.append(NEXT_STEPS_TEMPLATES['docs_low'])
-    if getattr(scores, 'clean_code', 0.0) < 6.0:
-        recs.append(NEXT_STEPS_TEMPLATES['too_large'])
-    if getattr(scores, 'attention', 0.0) > 60.0:
-        recs.append(NEXT_STEPS_TEMPLATES['needs_review'])
-    if getattr(scores, 'efficiency', 0.0) < 5.0:
-        recs.append(NEXT_STEPS_TEMPLATES['perf_risk'])
+    if _CONCRETE_SCORES and isinstance(scores, Scores):
+        # Dataclass fields are guaranteed; plain attribute reads are cheaper.
+        stability = scores.stability
+        verbosity = scores.verbosity
+        clean_code = scores.clean_code
+        attention = scores.attention
+        efficiency = scores.efficiency
+    else:
+        stability = getattr(scores, 'stability', 0.0)
+        verbosity = getattr(scores, 'verbosity', 0.0)
+        clean_code = getattr(scores, 'clean_code', 0.0)
+        attention = getattr(scores, 'attention', 0.0)
+        efficiency = getattr(scores, 'efficiency', 0.0)
+
+    if stability < 6.0 or not has_tests:
+        recs.append(_TESTS_MISSING)
+    if verbosity < 5.0:
+        recs.append(_DOCS_LOW)
+    if clean_code < 6.0:
+        recs.append(_TOO_LARGE)
+    if attention > 60.0:
+        recs.append(_NEEDS_REVIEW)
+    if efficiency < 5.0:
+        recs.append(_PERF_RISK)
 
     # De-duplicate while preserving order, and cap at 3
     seen = set()
@@ -80,22 +103,20 @@ def roadmap_hint(aggregate: Sequence[Dict[str, Any]]) -> str:
 
     total = len(aggregate)
 
-    attn_high = sum(
-        1 for a in aggregate
-        if a.get('scores') is not None and float(getattr(a['scores'], 'attention', 0.0)) > 70.0
-    )
-    low_docs = sum(
-        1 for a in aggregate
-        if a.get('scores') is not None and float(getattr(a['scores'], 'verbosity', 0.0)) < 5.0
-    )
-    low_tests = sum(
-        1 for a in aggregate
-        if a.get('pr') is not None and not bool(a['pr'].get('has_tests'))
-    )
-    perf_risk = sum(
-        1 for a in aggregate
-        if a.get('scores') is not None and float(getattr(a['scores'], 'efficiency', 0.0)) < 5.0
-    )
+    # Single pass over the batch, accumulating all four counters.
+    attn_high = low_docs = low_tests = perf_risk = 0
+    for a in aggregate:
+        s = a.get('scores')
+        if s is not None:
+            if float(getattr(s, 'attention', 0.0)) > 70.0:
+                attn_high += 1
+            if float(getattr(s, 'verbosity', 0.0)) < 5.0:
+                low_docs += 1
+            if float(getattr(s, 'efficiency', 0.0)) < 5.0:
+                perf_risk += 1
+        p = a.get('pr')
+        if p is not None and not bool(p.get('has_tests')):
+            low_tests += 1
 
     if attn_high >= max(2, total // 3) and low_docs >= max(2, total // 4):
         return "Prioritize a documentation and testing sprint; enforce PR size guardrails and module ownership."
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from functools import lru_cache
 
 
-@dataclass
+# Slotted and immutable: instances are created per PR and only ever read.
+@dataclass(slots=True, frozen=True)
 class Scores:
     code_quality: float
     verbosity: float
@@ -20,14 +22,29 @@ def clamp(value: float, lo: float = 0.0, hi: float = 10.0) -> float:
 
 def score_pr(pr: dict) -> Scores:
     # Defensive extraction with defaults for a minimal PR dict
-    additions = int(pr.get("additions", 0) or 0)
-    deletions = int(pr.get("deletions", 0) or 0)
-    changed_files = int(pr.get("changed_files", 0) or 0)
-    has_tests = bool(pr.get("has_tests", False))
-    doc_touch_ratio = float(pr.get("doc_touch_ratio", 0.0) or 0.0)
-    draft = bool(pr.get("draft", False))
-    state = pr.get("state", "open") or "open"
+    return _score_fields(
+        int(pr.get("additions", 0) or 0),
+        int(pr.get("deletions", 0) or 0),
+        int(pr.get("changed_files", 0) or 0),
+        bool(pr.get("has_tests", False)),
+        float(pr.get("doc_touch_ratio", 0.0) or 0.0),
+        bool(pr.get("draft", False)),
+        pr.get("state", "open") or "open",
+    )
+
 
+# Scores is a pure function of these fields and is immutable, so repeat
+# scoring of the same PR shares one cached instance.
+@lru_cache(maxsize=4096)
+def _score_fields(
+    additions: int,
+    deletions: int,
+    changed_files: int,
+    has_tests: bool,
+    doc_touch_ratio: float,
+    draft: bool,
+    state: str,
+) -> Scores:
     churn = additions + deletions
 
     # Size penalty steps
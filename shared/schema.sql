@@ -11,7 +11,8 @@ CREATE TABLE IF NOT EXISTS runs (
   duration_seconds INTEGER,
   pr_url TEXT,
   details_url TEXT,
-  raw JSON
+  raw JSON,
+  sort_key TEXT GENERATED ALWAYS AS (COALESCE(updated_at, created_at, id)) VIRTUAL
 );
 CREATE INDEX IF NOT EXISTS runs_updated ON runs(updated_at DESC);
 
@@ -35,7 +36,8 @@ CREATE TABLE IF NOT EXISTS prs (
   ci_status TEXT,                   -- success/failure/pending/unknown
   has_tests INTEGER,                -- 0/1 heuristic
   doc_touch_ratio REAL,             -- 0..1
-  diff_stats JSON                   -- raw enrichment cache
+  diff_stats JSON,                  -- raw enrichment cache
+  sort_key TEXT GENERATED ALWAYS AS (COALESCE(updated_at, created_at)) VIRTUAL
 );
 CREATE INDEX IF NOT EXISTS prs_updated ON prs(updated_at DESC);
 
@@ -43,4 +45,10 @@ CREATE TABLE IF NOT EXISTS run_prs (
   run_id TEXT,
   pr_id TEXT,
   PRIMARY KEY (run_id, pr_id)
-);
\ No newline at end of file
+);
+
+CREATE TABLE IF NOT EXISTS http_cache (
+  url TEXT PRIMARY KEY,             -- GitHub API URL
+  etag TEXT,
+  body JSON                         -- last 200 response body
+);